@@ -1,4 +1,5 @@
 import click
+import concurrent.futures
 import logging
 import os
 from colorama import Fore, Style
@@ -52,19 +53,28 @@ def cli():
     type=click.Path(),
 )
 @click.option(
-    "--override", "-f", help="Forces to build unchanged recipes.", is_flag=True
+    "--override",
+    "-f",
+    help="Forces to rebuild recipes from scratch, even unchanged ones.",
+    is_flag=True,
 )
 @click.option(
-    "--num-jobs", "-j", default=1, help="Number of parallel jobs for building."
+    "--num-jobs",
+    "-j",
+    default=1,
+    help="Number of parallel jobs for building.",
+    type=click.IntRange(min=1),
 )
 def build(recipes_folder, build_folder, override, num_jobs):
     """Build all recipes"""
     recipes_folder = os.path.abspath(recipes_folder)
     build_folder = os.path.abspath(build_folder)
 
-    build_docker_python_sandbox_image()
-    artifacts = read_recipes(recipes_folder)
-    dependencies_graph = compute_dependencies_graph(artifacts)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        sandbox_image = executor.submit(build_docker_python_sandbox_image)
+        artifacts = read_recipes(recipes_folder, build_folder)
+        dependencies_graph = compute_dependencies_graph(artifacts)
+        sandbox_image.result()
 
     build_all(
         recipes_folder,
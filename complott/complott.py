@@ -1,60 +1,140 @@
 import abc
-import docker
-import filecmp
+import concurrent.futures
+import errno
+import fastjsonschema
+import functools
 import graphlib
 import hashlib
 import io
 import json
-import jsonschema
 import logging
 import os
-import queue
+import posixpath
 import shutil
 import sys
+import threading
 import urllib.parse
-import urllib.request
+
+try:
+    import orjson
+
+    json_loads = orjson.loads
+    json_dumps = orjson.dumps
+except ImportError:
+    json_loads = json.loads
+
+    def json_dumps(obj):
+        return json.dumps(obj).encode("utf-8")
+
+
+logger = logging.getLogger("complott")
 
 Dependencys = [
-    "numpy",
-    "pandas",
-    "xlrd",
-    "openpyxl",
-    "markdownify",
-    "sentence_transformers",
+    "markdownify==0.14.1",
+    "numpy==2.1.3",
+    "openpyxl==3.1.5",
+    "pandas==2.2.3",
+    "sentence_transformers==3.3.1",
+    "xlrd==2.0.1",
+]
+# versions of the packages required by Dependencys, resolved for Python 3.11,
+# torch pins its CUDA packages and triton itself
+DependencysConstraints = [
+    "beautifulsoup4==4.12.3",
+    "certifi==2024.8.30",
+    "charset-normalizer==3.4.0",
+    "et-xmlfile==2.0.0",
+    "filelock==3.16.1",
+    "fsspec==2024.10.0",
+    "huggingface-hub==0.26.3",
+    "idna==3.10",
+    "jinja2==3.1.4",
+    "joblib==1.4.2",
+    "markupsafe==3.0.2",
+    "mpmath==1.3.0",
+    "networkx==3.4.2",
+    "packaging==24.2",
+    "pillow==11.0.0",
+    "python-dateutil==2.9.0.post0",
+    "pytz==2024.2",
+    "pyyaml==6.0.2",
+    "regex==2024.11.6",
+    "requests==2.32.3",
+    "safetensors==0.4.5",
+    "scikit-learn==1.5.2",
+    "scipy==1.14.1",
+    "six==1.16.0",
+    "soupsieve==2.6",
+    "sympy==1.13.1",
+    "threadpoolctl==3.5.0",
+    "tokenizers==0.20.3",
+    "torch==2.5.1",
+    "tqdm==4.67.1",
+    "transformers==4.46.3",
+    "typing-extensions==4.12.2",
+    "tzdata==2024.2",
+    "urllib3==2.2.3",
 ]
 dockerfile = (
     """FROM python:3.11-slim
+RUN pip install --no-cache-dir --root-user-action=ignore pip==24.3.1
+RUN printf '%s\\n' """
+    + " ".join(sorted(DependencysConstraints))
+    + """ > /tmp/constraints.txt && pip install --no-cache-dir --root-user-action=ignore -c /tmp/constraints.txt """
+    + " ".join(sorted(Dependencys))
+    + """ && rm /tmp/constraints.txt
 ARG UID=1000
 ARG GID=1000
-RUN addgroup appgroup --gid "$GID" 
-RUN adduser appuser --uid "$UID" --gid "$GID" --disabled-password --gecos ""
+RUN addgroup appgroup --gid "$GID" && adduser appuser --uid "$UID" --gid "$GID" --disabled-password --gecos ""
 USER appuser
-RUN pip install --no-cache-dir --upgrade pip --no-warn-script-location
-RUN pip install --no-cache-dir """
-    + " ".join(Dependencys)
-    + """ --no-warn-script-location
 WORKDIR /app"""
 )
 
 
+def get_sandbox_build_args():
+    return {"UID": str(os.getuid()), "GID": str(os.getgid())}
+
+
+@functools.cache
+def get_sandbox_image_tag():
+    image_hash = hashlib.sha1(dockerfile.encode("utf-8"))
+    for arg_name, arg_value in sorted(get_sandbox_build_args().items()):
+        image_hash.update(f"\n{arg_name}={arg_value}".encode("utf-8"))
+    return f"recipe-sandbox:{image_hash.hexdigest()[:12]}"
+
+
+@functools.cache
+def get_docker_client():
+    import docker
+
+    return docker.from_env()
+
+
 def build_docker_python_sandbox_image():
-    logger = logging.getLogger("complott")
+    import docker
+
+    client = get_docker_client()
+    tag = get_sandbox_image_tag()
+    if len(client.images.list(name=tag)) > 0:
+        logger.info(f"Found Docker image '{tag}'")
+        return
     logger.info("Building Docker image...")
-    client = docker.from_env()
     try:
         logs = client.api.build(
             fileobj=io.BytesIO(dockerfile.encode("utf-8")),
-            tag="recipe-sandbox",
-            buildargs={"UID": str(os.getuid()), "GID": str(os.getgid())},
+            tag=tag,
+            buildargs=get_sandbox_build_args(),
             decode=True,
         )
+        log_lines = logger.isEnabledFor(logging.DEBUG)
         for entry in logs:
-            if "stream" in entry:
-                line = entry["stream"]
-                if line[-1] == "\n":
-                    line = line[:-1]
-                if len(line) == 0:
-                    continue
+            if "errorDetail" in entry:
+                logger.error(entry["errorDetail"]["message"])
+                sys.exit(os.EX_CONFIG)
+            if not log_lines:
+                continue
+            line = entry.get("stream", "").rstrip("\n")
+            if line:
                 logger.debug(line)
     except docker.errors.BuildError as e:
         if e.build_log:
@@ -66,6 +146,9 @@ def build_docker_python_sandbox_image():
         sys.exit(os.EX_CONFIG)
 
 
+file_name_pattern = r'^(?![ .])[^<>:"/\\|?*\r\n]+(?<![ .])$'
+url_pattern = r"^https?:\/\/(?:www\.)?[-a-zA-Z0-9@:%._\+~#=]{1,256}\.[a-zA-Z0-9()]{1,6}(?:[-a-zA-Z0-9()@:%_\+.~#?&\/=]*)$"
+
 versions_schema = {
     "$schema": "http://json-schema.org/draft-07/schema#",
     "type": "object",
@@ -75,11 +158,11 @@ versions_schema = {
             "properties": {
                 "folder": {
                     "type": "string",
-                    "pattern": '^(?![ .])[^<>:"/\\|?*\r\n]+(?<![ .])$',
+                    "pattern": file_name_pattern,
                 },
                 "artifact_folder": {
                     "type": "string",
-                    "pattern": '^(?![ .])[^<>:"/\\|?*\r\n]+(?<![ .])$',
+                    "pattern": file_name_pattern,
                 },
             },
             "required": ["folder"],
@@ -114,31 +197,75 @@ class Recipe(Artifact):
         self.name = recipe_name
         self.version = recipe_version
         self.version_source_folder = version_json["folder"]
-        if "folder_alias" in version_json:
-            self.version_build_folder = version_json["folder_alias"]
+        if "artifact_folder" in version_json:
+            self.version_build_folder = version_json["artifact_folder"]
         else:
             self.version_build_folder = self.version_source_folder
         self.dependencies = dependencies
+        self._id = f"{Recipe.__name__}:{self.name}/{self.version}"
+        self._relative_build_path = os.path.join(
+            "recipes", self.name, self.version_build_folder
+        )
 
     def get_source_path(self, recipes_folder):
         return os.path.join(recipes_folder, self.name, self.version_source_folder)
 
     def get_build_path(self, build_folder):
-        return os.path.join(
-            build_folder, "recipes", self.name, self.version_build_folder
-        )
+        return os.path.join(build_folder, self._relative_build_path)
 
     def id(self):
-        return f"{Recipe.__name__}:{self.name}/{self.version}"
+        return self._id
 
 
-def left_files_changed(dcmp):
-    if len(dcmp.left_only) > 0:
-        return True
-    if len(dcmp.diff_files) > 0:
+def get_manifest_path(build_path):
+    return f"{build_path}.manifest.json"
+
+
+def read_manifest(manifest_path):
+    try:
+        return read_json(manifest_path)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def write_manifest(manifest_path, manifest):
+    with open(manifest_path, "wb") as manifest_file:
+        manifest_file.write(json_dumps(manifest))
+
+
+def hash_file(file_path):
+    file_hash = hashlib.sha1()
+    with open(file_path, "rb") as file:
+        while chunk := file.read(1 << 20):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
+
+
+def compute_manifest(root, previous_manifest):
+    manifest = {}
+    for dir_path, _, file_names in os.walk(root):
+        for file_name in file_names:
+            file_path = os.path.join(dir_path, file_name)
+            relative_path = os.path.relpath(file_path, root)
+            stat = os.stat(file_path)
+            # only hash files whose size or modification time changed
+            previous_entry = previous_manifest.get(relative_path)
+            if previous_entry is not None and previous_entry[:2] == [
+                stat.st_size,
+                stat.st_mtime_ns,
+            ]:
+                digest = previous_entry[2]
+            else:
+                digest = hash_file(file_path)
+            manifest[relative_path] = [stat.st_size, stat.st_mtime_ns, digest]
+    return manifest
+
+
+def manifest_differs(manifest, previous_manifest):
+    if manifest.keys() != previous_manifest.keys():
         return True
-    for sub_dcmp in dcmp.subdirs.values():
-        if left_files_changed(sub_dcmp):
+    for relative_path, entry in manifest.items():
+        if entry[2] != previous_manifest[relative_path][2]:
             return True
     return False
 
@@ -154,32 +281,50 @@ class PythonRecipe(Recipe):
         return False
 
     def build(self, recipes_folder, build_folder, artifacts, override=False):
+        import docker
+
         super().build(recipes_folder, build_folder, artifacts, override)
-        logger = logging.getLogger("complott")
 
         recipe_path = self.get_source_path(recipes_folder)
         build_path = self.get_build_path(build_folder)
+        manifest_path = get_manifest_path(build_path)
+        previous_manifest = read_manifest(manifest_path)
+        manifest = compute_manifest(recipe_path, previous_manifest)
 
         if os.path.exists(build_path):
             if (
-                not left_files_changed(filecmp.dircmp(recipe_path, build_path))
+                not manifest_differs(manifest, previous_manifest)
                 and not self.dependencies_changed(artifacts)
                 and not override
             ):
+                # record new sizes and mtimes so touched files are not hashed again
+                if manifest != previous_manifest:
+                    write_manifest(manifest_path, manifest)
                 logger.debug(f"Skipped '{self.id()}' (did not changed)")
                 return
+        if os.path.exists(manifest_path):
+            os.remove(manifest_path)
+        # outputs in data/ are kept for the recipe to reuse unless overriding,
+        # anything else is left over from older build folder layouts
+        if override and os.path.exists(build_path):
             shutil.rmtree(build_path)
-
-        shutil.copytree(recipe_path, build_path)
+        elif os.path.exists(build_path):
+            with os.scandir(build_path) as entries:
+                for entry in entries:
+                    if entry.name == "data":
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        shutil.rmtree(entry.path)
+                    else:
+                        os.remove(entry.path)
 
         volumes = {}
-        volumes[build_path] = {
+        volumes[recipe_path] = {
             "bind": "/app/recipe",
             "mode": "ro",
         }
         data_path = os.path.join(build_path, "data")
-        if not os.path.exists(os.path.join(build_path, "data")):
-            os.makedirs(data_path)
+        os.makedirs(data_path, exist_ok=True)
         volumes[data_path] = {
             "bind": "/app/data",
             "mode": "rw",
@@ -193,10 +338,9 @@ class PythonRecipe(Recipe):
             }
 
         try:
-            client = docker.from_env()
-            container_logs = client.containers.run(
-                "recipe-sandbox",
-                ["python", "recipe/generate.py", self.version],
+            container_logs = get_docker_client().containers.run(
+                get_sandbox_image_tag(),
+                ["python", "-s", "-B", "recipe/generate.py", self.version],
                 remove=True,
                 volumes=volumes,
                 network_disabled=True,
@@ -212,8 +356,8 @@ class PythonRecipe(Recipe):
                 )
             )
             self.has_changed = True
+            write_manifest(manifest_path, manifest)
         except docker.errors.ContainerError as e:
-            os.remove(os.path.join(build_path, "recipe.json"))
             match e.exit_status:
                 case 1:
                     raise Exception(e.stderr.decode("utf-8"))
@@ -224,29 +368,80 @@ class PythonRecipe(Recipe):
 recipe_types = {"python": PythonRecipe}
 
 
+@functools.lru_cache(maxsize=4096)
 def normalize_url(url):
-    parsed = urllib.parse.urlparse(url)
-    netloc = parsed.hostname.lower() if parsed.hostname else ""
+    parsed = urllib.parse.urlsplit(url)
+    netloc = parsed.hostname or ""
     if parsed.port and parsed.port not in (80, 443):
         netloc += f":{parsed.port}"
     path = parsed.path.rstrip("/")
-    query = urllib.parse.urlencode(sorted(urllib.parse.parse_qsl(parsed.query)))
-    return urllib.parse.urlunparse(
-        (parsed.scheme.lower(), netloc, path, parsed.params, query, "")
+    query = (
+        urllib.parse.urlencode(sorted(urllib.parse.parse_qsl(parsed.query)))
+        if parsed.query
+        else ""
     )
+    return urllib.parse.urlunsplit((parsed.scheme.lower(), netloc, path, query, ""))
+
+
+@functools.cache
+def get_http_session():
+    import requests
+    import urllib3
+
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=32,
+        pool_maxsize=32,
+        max_retries=urllib3.util.Retry(
+            total=3, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504)
+        ),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+# content entries are checked, linked and removed under this lock, otherwise a
+# parallel fetch could remove an entry between its existence check and linking
+content_entries_lock = threading.Lock()
+hard_link_unsupported_errnos = {
+    errno.EPERM,
+    errno.EACCES,
+    errno.EXDEV,
+    errno.EMLINK,
+    errno.ENOTSUP,
+    errno.EOPNOTSUPP,
+}
+
+
+def remove_unlinked_content(content_path):
+    # a content entry only linked from the content folder is no longer used
+    # by any cache file
+    try:
+        if os.stat(content_path).st_nlink == 1:
+            os.remove(content_path)
+    except FileNotFoundError:
+        pass
 
 
 class Fetch(Artifact):
     def __init__(self, dependency_json):
         super().__init__()
         self.url = normalize_url(dependency_json["url"])
+        parsed_url = urllib.parse.urlsplit(self.url)
+        self.default_file_name = (
+            posixpath.basename(parsed_url.path) or parsed_url.hostname
+        )
+        self._cache_file_name = hashlib.blake2b(
+            self.url.encode("utf-8"), digest_size=12
+        ).hexdigest()
+        self._id = f"{Fetch.__name__}:{self.url}"
 
     def get_build_path(self, build_folder):
-        cache_file_name = hashlib.sha1(self.url.encode("utf-8")).hexdigest()[:24]
-        return os.path.join(build_folder, "fetch_cache", cache_file_name)
+        return os.path.join(build_folder, "fetch_cache", self._cache_file_name)
 
     def id(self):
-        return f"{Fetch.__name__}:{self.url}"
+        return self._id
 
     def _compact_url(self, max_length):
         parsed = urllib.parse.urlparse(self.url)
@@ -256,22 +451,81 @@ class Fetch(Artifact):
         return f"{hostname}/.../{target_name[-max_length+hostname_length+5:]}"
 
     def build(self, recipes_folder, build_folder, artifacts, override=False):
-        logger = logging.getLogger("complott")
         cache_file_path = self.get_build_path(build_folder)
         if os.path.exists(cache_file_path) and not override:
             logger.debug(f"Found '{self._compact_url(40)}' in cache")
             return True
 
+        etag_file_path = f"{cache_file_path}.etag"
+        digest_file_path = f"{cache_file_path}.sha256"
+        part_file_path = f"{cache_file_path}.part"
+        content_folder = os.path.join(build_folder, "fetch_cache", "by-sha256")
+        headers = {}
+        if os.path.exists(cache_file_path) and os.path.exists(etag_file_path):
+            with open(etag_file_path) as etag_file:
+                headers["If-None-Match"] = etag_file.read()
+        previous_digest = None
+        if os.path.exists(digest_file_path):
+            with open(digest_file_path) as digest_file:
+                previous_digest = digest_file.read()
+
         try:
-            fetch_folder = os.path.join(build_folder, "fetch_cache")
-            if not os.path.exists(fetch_folder):
-                os.mkdir(fetch_folder)
-            urllib.request.urlretrieve(self.url, cache_file_path)
+            os.makedirs(content_folder, exist_ok=True)
+            with get_http_session().get(
+                self.url, headers=headers, stream=True, timeout=60
+            ) as response:
+                response.raise_for_status()
+                if response.status_code == 304:
+                    logger.debug(f"Found '{self._compact_url(40)}' unchanged")
+                    return True
+                response.raw.decode_content = True
+                content_hash = hashlib.sha256()
+                with open(part_file_path, "wb") as part_file:
+                    while chunk := response.raw.read(1 << 20):
+                        content_hash.update(chunk)
+                        part_file.write(chunk)
+                etag = response.headers.get("ETag")
+
+            # bodies are stored once per content and hard linked from the
+            # url keyed cache files, identical downloads are deduplicated
+            digest = content_hash.hexdigest()
+            content_path = os.path.join(content_folder, digest)
+            with content_entries_lock:
+                if os.path.exists(content_path):
+                    os.remove(part_file_path)
+                else:
+                    os.replace(part_file_path, content_path)
+                content_unchanged = (
+                    os.path.exists(cache_file_path) and previous_digest == digest
+                )
+                if not content_unchanged:
+                    try:
+                        os.link(content_path, part_file_path)
+                    except OSError as e:
+                        # file systems without hard links get a copy instead
+                        if e.errno not in hard_link_unsupported_errnos:
+                            raise
+                        shutil.copyfile(content_path, part_file_path)
+                    os.replace(part_file_path, cache_file_path)
+                    with open(digest_file_path, "w") as digest_file:
+                        digest_file.write(digest)
+                    if previous_digest is not None:
+                        remove_unlinked_content(
+                            os.path.join(content_folder, previous_digest)
+                        )
+            if etag is not None:
+                with open(etag_file_path, "w") as etag_file:
+                    etag_file.write(etag)
+            elif os.path.exists(etag_file_path):
+                os.remove(etag_file_path)
+            if content_unchanged:
+                logger.debug(f"Found '{self._compact_url(40)}' unchanged")
+                return True
             self.has_changed = True
         except Exception as e:
             logger.error(f"Failed to download '{self.url}'\n ---> {e}")
-            if os.path.exists(cache_file_path):
-                os.remove(cache_file_path)
+            if os.path.exists(part_file_path):
+                os.remove(part_file_path)
             raise e
 
         logger.debug(f"Fetched '{self._compact_url(40)}'")
@@ -292,16 +546,17 @@ class FetchDependency(Dependency):
     def __init__(self, artifact, dependency_json):
         super().__init__()
         self._artifact = artifact
+        self._artifact_id = artifact.id()
         if "file_name" in dependency_json:
             self.file_name = dependency_json["file_name"]
         else:
-            self.file_name = artifact.url[artifact.url.rfind("/") + 1 :]
+            self.file_name = artifact.default_file_name
 
     def get_mounting_path(self):
         return f"fetched/{self.file_name}"
 
     def artifact_id(self):
-        return self._artifact.id()
+        return self._artifact_id
 
 
 def register_fetch_dependency(artifacts, dependency_json):
@@ -317,12 +572,13 @@ class RecipeDependency(Dependency):
         super().__init__()
         self.recipe_name = dependency_json["recipe_name"]
         self.version = dependency_json["version"]
+        self._artifact_id = f"{Recipe.__name__}:{self.recipe_name}/{self.version}"
 
     def get_mounting_path(self):
         return f"recipes/{self.recipe_name}/{self.version}"
 
     def artifact_id(self):
-        return f"{Recipe.__name__}:{self.recipe_name}/{self.version}"
+        return self._artifact_id
 
 
 def register_recipe_dependency(artifacts, dependency_json):
@@ -336,11 +592,11 @@ dependency_types = {
                 "type": {},
                 "url": {
                     "type": "string",
-                    "pattern": "^https?:\/\/(?:www\.)?[-a-zA-Z0-9@:%._\+~#=]{1,256}\.[a-zA-Z0-9()]{1,6}(?:[-a-zA-Z0-9()@:%_\+.~#?&\/=]*)$",
+                    "pattern": url_pattern,
                 },
                 "file_name": {
                     "type": "string",
-                    "pattern": '^(?![ .])[^<>:"/\\|?*\r\n]+(?<![ .])$',
+                    "pattern": file_name_pattern,
                 },
             },
             "required": ["type", "url"],
@@ -354,7 +610,7 @@ dependency_types = {
                 "type": {},
                 "recipe_name": {
                     "type": "string",
-                    "pattern": '^(?![ .])[^<>:"/\\|?*\r\n]+(?<![ .])$',
+                    "pattern": file_name_pattern,
                 },
                 "version": {"type": "string"},
             },
@@ -392,79 +648,198 @@ recipe_schema = {
 }
 
 
-def read_recipes(recipes_folder):
-    logger = logging.getLogger("complott")
-    logger.info("Reading recipes...")
-    artifacts = dict()
-    for item in os.listdir(recipes_folder):
-        if not os.path.isdir(os.path.join(recipes_folder, item)):
-            continue
-        recipe_name = item
-        recipe_path = os.path.join(recipes_folder, recipe_name)
+validate_versions = fastjsonschema.compile(versions_schema)
+validate_recipe = fastjsonschema.compile(recipe_schema)
+
 
-        versions_json_path = os.path.join(recipe_path, "versions.json")
-        if not os.path.exists(versions_json_path):
-            logger.warning(
-                f"Skipped recipe '{recipe_name}', 'versions.json' not found."
+recipes_schemas_hash = hashlib.sha1(
+    json_dumps([versions_schema, recipe_schema])
+).hexdigest()
+
+
+def read_json(file_path):
+    with open(file_path, "rb") as file:
+        return json_loads(file.read())
+
+
+def get_file_signature(file_path):
+    try:
+        stat = os.stat(file_path)
+    except FileNotFoundError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def load_recipe(recipe_path):
+    recipe_name = os.path.basename(recipe_path)
+    messages = []
+    recipe_versions = []
+    # signatures are taken before reading: a concurrent edit can only cause a
+    # needless reload of the recipes cache, never a stale one
+    read_files = dict()
+
+    versions_path = os.path.join(recipe_path, "versions.json")
+    read_files[versions_path] = get_file_signature(versions_path)
+    try:
+        versions = read_json(versions_path)
+    except FileNotFoundError:
+        messages.append(
+            (
+                logging.WARNING,
+                f"Skipped recipe '{recipe_name}', 'versions.json' not found.",
+            )
+        )
+        return messages, recipe_versions, read_files
+    try:
+        validate_versions(versions)
+    except fastjsonschema.JsonSchemaValueException as e:
+        messages.append(
+            (
+                logging.WARNING,
+                f"Skipped recipe '{recipe_name}', 'versions.json' has invalid scheme:\n ---> "
+                + e.definition.get("error_msg", e.message),
+            )
+        )
+        return messages, recipe_versions, read_files
+
+    for version_name, version_json in versions.items():
+        recipe_json_path = os.path.join(
+            recipe_path, version_json["folder"], "recipe.json"
+        )
+        read_files[recipe_json_path] = get_file_signature(recipe_json_path)
+        try:
+            recipe_json = read_json(recipe_json_path)
+        except FileNotFoundError:
+            messages.append(
+                (
+                    logging.WARNING,
+                    f"Skipped recipe '{recipe_name}/{version_name}', 'recipe.json' not found.",
+                )
             )
             continue
-        with open(versions_json_path) as version_file:
-            versions = json.load(version_file)
-            try:
-                jsonschema.validate(versions, versions_schema)
-            except jsonschema.ValidationError as e:
-                logger.warning(
-                    f"Skipped recipe '{recipe_name}', 'versions.json' has invalid scheme:\n ---> "
-                    + e.schema.get("error_msg", e.message)
+        try:
+            validate_recipe(recipe_json)
+        except fastjsonschema.JsonSchemaValueException as e:
+            messages.append(
+                (
+                    logging.WARNING,
+                    f"Skipped recipe '{recipe_name}/{version_name}', 'recipe.json' has invalid scheme:\n ---> "
+                    + e.definition.get("error_msg", e.message),
                 )
-                continue
+            )
+            continue
+        recipe_versions.append((version_name, version_json, recipe_json))
 
-        for version_name, version_json in versions.items():
-            recipe_version_path = os.path.join(recipe_path, version_json["folder"])
-            recipe_json_path = os.path.join(recipe_version_path, "recipe.json")
-            if not os.path.exists(recipe_json_path):
-                logger.warning(
-                    f"Skipped recipe '{recipe_name}/{version_name}', 'recipe.json' not found."
-                )
-                continue
-            with open(recipe_json_path) as recipe_file:
-                recipe_json = json.load(recipe_file)
-                try:
-                    jsonschema.validate(recipe_json, recipe_schema)
-                except jsonschema.ValidationError as e:
-                    logger.warning(
-                        f"Skipped recipe '{recipe_name}/{version_name}', 'recipe.json' has invalid scheme:\n ---> "
-                        + e.schema.get("error_msg", e.message)
-                    )
-                    continue
-
-                recipe_dependencies = []
-                for dependency_json in recipe_json["dependencies"]:
-                    dependency_type = dependency_json["type"]
-                    if dependency_type not in dependency_types:
-                        logger.critical(
-                            "Dependency type '{}' is unknwon but passed JSON validation.".format(
-                                dependency_type
-                            )
-                        )
-                        sys.exit(os.EX_CONFIG)
+    return messages, recipe_versions, read_files
+
+
+def list_recipes_names(recipes_folder):
+    with os.scandir(recipes_folder) as entries:
+        return [entry.name for entry in entries if entry.is_dir()]
 
-                    recipe_dependencies.append(
-                        dependency_types[dependency_type]["register_function"](
-                            artifacts, dependency_json
+
+def load_recipes(recipes_folder):
+    recipes_paths = [
+        os.path.join(recipes_folder, recipe_name)
+        for recipe_name in list_recipes_names(recipes_folder)
+    ]
+
+    loaded_recipes = []
+    read_files = dict()
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=min(32, (os.cpu_count() or 1) * 4)
+    ) as executor:
+        for recipe_path, (messages, recipe_versions, recipe_read_files) in zip(
+            recipes_paths, executor.map(load_recipe, recipes_paths)
+        ):
+            loaded_recipes.append(
+                (os.path.basename(recipe_path), messages, recipe_versions)
+            )
+            read_files.update(recipe_read_files)
+    return loaded_recipes, read_files
+
+
+def recipes_cache_is_valid(cache, recipes_folder):
+    # only the files load_recipe opened need to be checked: if no
+    # 'versions.json' changed, the 'recipe.json' files it points to are the same
+    return (
+        cache["schemas_hash"] == recipes_schemas_hash
+        and cache["recipes_names"] == sorted(list_recipes_names(recipes_folder))
+        and all(
+            get_file_signature(os.path.join(recipes_folder, file_path)) == signature
+            for file_path, signature in cache["files"].items()
+        )
+    )
+
+
+def load_recipes_cached(recipes_folder, build_folder):
+    cache_path = os.path.join(build_folder, ".recipe_cache.json")
+    try:
+        cache = read_json(cache_path)
+        if recipes_cache_is_valid(cache, recipes_folder):
+            return cache["recipes"]
+    except (FileNotFoundError, ValueError, KeyError, TypeError, AttributeError):
+        pass
+
+    loaded_recipes, read_files = load_recipes(recipes_folder)
+    cache = {
+        "schemas_hash": recipes_schemas_hash,
+        "recipes_names": sorted(recipe_name for recipe_name, _, _ in loaded_recipes),
+        "files": {
+            os.path.relpath(file_path, recipes_folder): signature
+            for file_path, signature in read_files.items()
+        },
+        "recipes": loaded_recipes,
+    }
+    os.makedirs(build_folder, exist_ok=True)
+    with open(cache_path + ".tmp", "wb") as cache_file:
+        cache_file.write(json_dumps(cache))
+    os.replace(cache_path + ".tmp", cache_path)
+    return loaded_recipes
+
+
+def read_recipes(recipes_folder, build_folder=None):
+    logger.info("Reading recipes...")
+    artifacts = dict()
+
+    if build_folder is None:
+        loaded_recipes, _ = load_recipes(recipes_folder)
+    else:
+        loaded_recipes = load_recipes_cached(recipes_folder, build_folder)
+
+    # artifacts are registered on this thread to keep logs ordered and
+    # 'artifacts' unshared between the loading threads
+    for recipe_name, messages, recipe_versions in loaded_recipes:
+        for level, message in messages:
+            logger.log(level, message)
+
+        for version_name, version_json, recipe_json in recipe_versions:
+            recipe_dependencies = []
+            for dependency_json in recipe_json["dependencies"]:
+                dependency_type = dependency_json["type"]
+                if dependency_type not in dependency_types:
+                    logger.critical(
+                        "Dependency type '{}' is unknwon but passed JSON validation.".format(
+                            dependency_type
                         )
                     )
-                recipe = recipe_types[recipe_json["recipe_type"]](
-                    recipe_name, version_name, version_json, recipe_dependencies
+                    sys.exit(os.EX_CONFIG)
+
+                recipe_dependencies.append(
+                    dependency_types[dependency_type]["register_function"](
+                        artifacts, dependency_json
+                    )
                 )
-                artifacts[recipe.id()] = recipe
-                logger.debug(f"Added recipe '{recipe.name}/{recipe.version}'")
+            recipe = recipe_types[recipe_json["recipe_type"]](
+                recipe_name, version_name, version_json, recipe_dependencies
+            )
+            artifacts[recipe.id()] = recipe
+            logger.debug(f"Added recipe '{recipe.name}/{recipe.version}'")
 
     return artifacts
 
 
 def compute_dependencies_graph(artifacts):
-    logger = logging.getLogger("complott")
     logger.info("Computing dependencies graph...")
     topological_sorter = graphlib.TopologicalSorter()
 
@@ -485,40 +860,54 @@ def build_all(
     override=False,
     num_jobs=1,
 ):
-    logger = logging.getLogger("complott")
     if not os.path.exists(build_folder):
         os.mkdir(build_folder)
 
     logger.info(f"Building artifacts...")
     failed_artifacts_ids = set()
 
-    # task_queue = queue.Queue()
     dependencies_graph.prepare()
-    while dependencies_graph.is_active():
-        for artifact_id in dependencies_graph.get_ready():
-            artifact = artifacts[artifact_id]
-
-            if isinstance(artifact, Recipe):
-                for dependency in artifact.dependencies:
-                    dependency_artifact_id = dependency.artifact_id()
-                    if dependency_artifact_id in failed_artifacts_ids:
-                        logger.warning(
-                            f"Skipped '{artifact_id}', dependency '{dependency_artifact_id}' failed."
-                        )
-                        failed_artifacts_ids.add(artifact_id)
-                        dependencies_graph.done(artifact_id)
-                        break
-                if artifact_id in failed_artifacts_ids:
-                    continue
+    with concurrent.futures.ThreadPoolExecutor(max_workers=num_jobs) as executor:
+        running_builds = dict()
+        while dependencies_graph.is_active():
+            for artifact_id in dependencies_graph.get_ready():
+                artifact = artifacts[artifact_id]
+
+                if isinstance(artifact, Recipe):
+                    for dependency in artifact.dependencies:
+                        dependency_artifact_id = dependency.artifact_id()
+                        if dependency_artifact_id in failed_artifacts_ids:
+                            logger.warning(
+                                f"Skipped '{artifact_id}', dependency '{dependency_artifact_id}' failed."
+                            )
+                            failed_artifacts_ids.add(artifact_id)
+                            dependencies_graph.done(artifact_id)
+                            break
+                    if artifact_id in failed_artifacts_ids:
+                        continue
+
+                running_builds[
+                    executor.submit(
+                        artifact.build,
+                        recipes_folder,
+                        build_folder,
+                        artifacts,
+                        override=override,
+                    )
+                ] = artifact_id
 
-            # task_queue.put(artifact)
+            if len(running_builds) == 0:
+                continue
 
-            try:
-                artifact.build(
-                    recipes_folder, build_folder, artifacts, override=override
-                )
-            except Exception as e:
-                logger.error(f"While building '{artifact_id}':\n ---> {e}")
-                failed_artifacts_ids.add(artifact_id)
+            finished_builds, _ = concurrent.futures.wait(
+                running_builds, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for finished_build in finished_builds:
+                artifact_id = running_builds.pop(finished_build)
+                try:
+                    finished_build.result()
+                except Exception as e:
+                    logger.error(f"While building '{artifact_id}':\n ---> {e}")
+                    failed_artifacts_ids.add(artifact_id)
 
-            dependencies_graph.done(artifact_id)
+                dependencies_graph.done(artifact_id)
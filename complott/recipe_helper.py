@@ -1,4 +1,6 @@
 import csv
+import itertools
+
 
 def parse_csv_as_dict(
     file_path,
@@ -10,14 +12,14 @@ def parse_csv_as_dict(
     first_data_row=1,
     last_data_row=None,
 ):
+    if columns_types is None:
+        columns_types = [str for _ in columns]
     with open(file_path, "r") as file:
-        lines = [line.rstrip() for line in file]
-        if last_data_row is None:
-            last_data_row = len(lines)
-        if columns_types is None:
-            columns_types = [str for _ in columns]
-        data_rows = [lines[i] for i in range(first_data_row - 1, last_data_row)]
-        rows = list(csv.DictReader(data_rows, fieldnames=columns, delimiter=delimiter))
+        data_rows = (
+            line.rstrip()
+            for line in itertools.islice(file, first_data_row - 1, last_data_row)
+        )
+        rows = csv.DictReader(data_rows, fieldnames=columns, delimiter=delimiter)
         if indices is None:
             return {
                 row[index_column]: {
@@ -35,4 +37,4 @@ def parse_csv_as_dict(
                     if k != index_column
                 }
                 for row, i in zip(rows, indices)
-            }
\ No newline at end of file
+            }
@@ -0,0 +1,225 @@
+import concurrent.futures
+import errno
+import io
+import os
+import threading
+
+import pytest
+
+from complott import complott
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=b"", etag=None):
+        self.status_code = status_code
+        self.raw = io.BytesIO(body)
+        self.headers = {} if etag is None else {"ETag": etag}
+
+    def raise_for_status(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+class FakeSession:
+    def __init__(self):
+        self.bodies = dict()
+        self.requests = []
+
+    def get(self, url, headers, stream, timeout):
+        self.requests.append((url, headers))
+        body = self.bodies[url]
+        etag = f'"{len(body)}-{hash(body)}"'
+        if headers.get("If-None-Match") == etag:
+            return FakeResponse(304)
+        return FakeResponse(200, body, etag)
+
+
+@pytest.fixture
+def session(monkeypatch):
+    session = FakeSession()
+    monkeypatch.setattr(complott, "get_http_session", lambda: session)
+    return session
+
+
+def fetch(build_folder, url, override=False):
+    artifact = complott.Fetch({"type": "fetch", "url": url})
+    artifact.has_changed = False
+    artifact.build(None, build_folder, None, override=override)
+    return artifact
+
+
+def content_entries(build_folder):
+    return sorted(os.listdir(os.path.join(build_folder, "fetch_cache", "by-sha256")))
+
+
+def read(file_path):
+    with open(file_path, "rb") as file:
+        return file.read()
+
+
+def no_etag(init):
+    def __init__(self, status_code, body=b"", etag=None):
+        init(self, status_code, body)
+
+    return __init__
+
+
+def test_identical_bodies_are_stored_once(tmp_path, session):
+    build_folder = str(tmp_path)
+    session.bodies["https://example.com/a.csv"] = b"same"
+    session.bodies["https://example.com/b.csv"] = b"same"
+    a = fetch(build_folder, "https://example.com/a.csv")
+    b = fetch(build_folder, "https://example.com/b.csv")
+    assert a.has_changed and b.has_changed
+    assert len(content_entries(build_folder)) == 1
+    assert os.path.samefile(
+        a.get_build_path(build_folder), b.get_build_path(build_folder)
+    )
+
+
+def test_cached_files_are_not_fetched_again(tmp_path, session):
+    build_folder = str(tmp_path)
+    session.bodies["https://example.com/a.csv"] = b"body"
+    fetch(build_folder, "https://example.com/a.csv")
+    assert not fetch(build_folder, "https://example.com/a.csv").has_changed
+    assert len(session.requests) == 1
+
+
+def test_unchanged_body_is_not_a_change(tmp_path, session, monkeypatch):
+    build_folder = str(tmp_path)
+    url = "https://example.com/a.csv"
+    session.bodies[url] = b"body"
+    fetch(build_folder, url)
+    assert not fetch(build_folder, url, override=True).has_changed
+    assert session.requests[-1][1] == {"If-None-Match": f'"4-{hash(b"body")}"'}
+    # same body without etag validation
+    monkeypatch.setattr(FakeResponse, "__init__", no_etag(FakeResponse.__init__))
+    assert not fetch(build_folder, url, override=True).has_changed
+    assert content_entries(build_folder) == [
+        complott.hashlib.sha256(b"body").hexdigest()
+    ]
+
+
+def test_changed_body_replaces_unused_content(tmp_path, session):
+    build_folder = str(tmp_path)
+    url = "https://example.com/a.csv"
+    session.bodies[url] = b"old"
+    session.bodies["https://example.com/b.csv"] = b"shared"
+    fetch(build_folder, url)
+    fetch(build_folder, "https://example.com/b.csv")
+    session.bodies[url] = b"shared"
+    artifact = fetch(build_folder, url, override=True)
+    assert artifact.has_changed
+    assert read(artifact.get_build_path(build_folder)) == b"shared"
+    assert content_entries(build_folder) == [
+        complott.hashlib.sha256(b"shared").hexdigest()
+    ]
+    session.bodies[url] = b"new"
+    fetch(build_folder, url, override=True)
+    # still linked from b.csv
+    assert content_entries(build_folder) == sorted(
+        complott.hashlib.sha256(body).hexdigest() for body in (b"new", b"shared")
+    )
+    assert not [
+        file_name
+        for file_name in os.listdir(os.path.join(build_folder, "fetch_cache"))
+        if file_name.endswith(".part")
+    ]
+
+
+def test_copies_when_hard_links_are_unsupported(tmp_path, session, monkeypatch):
+    build_folder = str(tmp_path)
+    url = "https://example.com/a.csv"
+
+    def link(source, destination):
+        raise OSError(errno.EPERM, "hard links are not supported")
+
+    monkeypatch.setattr(complott.os, "link", link)
+    session.bodies[url] = b"old"
+    fetch(build_folder, url)
+    session.bodies[url] = b"new"
+    artifact = fetch(build_folder, url, override=True)
+    assert artifact.has_changed
+    assert read(artifact.get_build_path(build_folder)) == b"new"
+    assert content_entries(build_folder) == [
+        complott.hashlib.sha256(b"new").hexdigest()
+    ]
+
+
+def test_missing_content_entry_is_not_copied(tmp_path, session, monkeypatch):
+    build_folder = str(tmp_path)
+    url = "https://example.com/a.csv"
+
+    def link(source, destination):
+        raise FileNotFoundError(errno.ENOENT, "removed", source)
+
+    def copyfile(source, destination):
+        raise AssertionError("missing content entry was copied")
+
+    monkeypatch.setattr(complott.os, "link", link)
+    monkeypatch.setattr(complott.shutil, "copyfile", copyfile)
+    session.bodies[url] = b"body"
+    with pytest.raises(FileNotFoundError):
+        fetch(build_folder, url)
+
+
+def test_parallel_refetch_keeps_content_being_linked(tmp_path, session, monkeypatch):
+    build_folder = str(tmp_path)
+    url1, url2 = "https://example.com/1.csv", "https://example.com/2.csv"
+    session.bodies[url1] = b"old 1"
+    session.bodies[url2] = b"shared"
+    fetch(build_folder, url1)
+    fetch(build_folder, url2)
+    shared_path = os.path.join(
+        build_folder,
+        "fetch_cache",
+        "by-sha256",
+        complott.hashlib.sha256(b"shared").hexdigest(),
+    )
+    # url1 gets the body url2 is about to drop, url2 only reaches its cleanup
+    # once url1 is linking the shared content entry
+    session.bodies[url1] = b"shared"
+    session.bodies[url2] = b"new 2"
+    linking = threading.Event()
+    removed = threading.Event()
+
+    link = os.link
+
+    def slow_link(source, destination):
+        if source == shared_path:
+            linking.set()
+            removed.wait(timeout=0.2)
+        link(source, destination)
+
+    remove_unlinked_content = complott.remove_unlinked_content
+
+    def signaling_remove_unlinked_content(content_path):
+        remove_unlinked_content(content_path)
+        removed.set()
+
+    get = session.get
+
+    def waiting_get(url, **kwargs):
+        if url == url2:
+            linking.wait(timeout=1)
+        return get(url, **kwargs)
+
+    monkeypatch.setattr(complott.os, "link", slow_link)
+    monkeypatch.setattr(
+        complott, "remove_unlinked_content", signaling_remove_unlinked_content
+    )
+    monkeypatch.setattr(session, "get", waiting_get)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+        artifacts = list(
+            executor.map(
+                lambda url: fetch(build_folder, url, override=True), [url1, url2]
+            )
+        )
+    assert read(artifacts[0].get_build_path(build_folder)) == b"shared"
+    assert read(artifacts[1].get_build_path(build_folder)) == b"new 2"
+    assert os.path.exists(shared_path)
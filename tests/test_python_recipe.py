@@ -0,0 +1,202 @@
+import os
+
+import docker
+import pytest
+
+from complott import complott
+
+
+class FakeContainers:
+    def __init__(self):
+        self.runs = []
+        self.exit_status = 0
+
+    def run(self, image, command, volumes, **kwargs):
+        self.runs.append(volumes)
+        if self.exit_status != 0:
+            raise docker.errors.ContainerError(
+                None, self.exit_status, command, image, b"recipe failed"
+            )
+        return b""
+
+
+class FakeDockerClient:
+    def __init__(self):
+        self.containers = FakeContainers()
+
+
+@pytest.fixture
+def containers(monkeypatch):
+    client = FakeDockerClient()
+    monkeypatch.setattr(complott, "get_docker_client", lambda: client)
+    return client.containers
+
+
+@pytest.fixture
+def recipes_folder(tmp_path):
+    recipe_path = tmp_path / "recipes" / "recipe" / "v1"
+    recipe_path.mkdir(parents=True)
+    (recipe_path / "generate.py").write_text("print('generate')\n")
+    (recipe_path / "lib").mkdir()
+    (recipe_path / "lib" / "util.py").write_text("VALUE = 1\n")
+    return str(tmp_path / "recipes")
+
+
+@pytest.fixture
+def build_folder(tmp_path):
+    return str(tmp_path / "build")
+
+
+def make_recipe(dependencies=[]):
+    return complott.PythonRecipe("recipe", "v1", {"folder": "v1"}, dependencies)
+
+
+def build(recipes_folder, build_folder, artifacts={}, override=False):
+    recipe = make_recipe()
+    recipe.build(recipes_folder, build_folder, artifacts, override=override)
+    return recipe
+
+
+def source_path(recipes_folder, *path):
+    return os.path.join(recipes_folder, "recipe", "v1", *path)
+
+
+def set_mtime(file_path, mtime_ns):
+    os.utime(file_path, ns=(mtime_ns, mtime_ns))
+
+
+def write_file(file_path, content):
+    with open(file_path, "w") as file:
+        file.write(content)
+
+
+def test_compute_manifest_only_hashes_modified_files(tmp_path, monkeypatch):
+    (tmp_path / "a").write_text("a")
+    (tmp_path / "b").write_text("b")
+    manifest = complott.compute_manifest(str(tmp_path), {})
+    assert manifest["a"][2] == complott.hashlib.sha1(b"a").hexdigest()
+
+    hashed = []
+    hash_file = complott.hash_file
+    monkeypatch.setattr(
+        complott,
+        "hash_file",
+        lambda file_path: hashed.append(file_path) or hash_file(file_path),
+    )
+    assert complott.compute_manifest(str(tmp_path), manifest) == manifest
+    assert hashed == []
+    set_mtime(tmp_path / "b", manifest["b"][1] + 1)
+    assert (
+        complott.compute_manifest(str(tmp_path), manifest)["b"][2] == manifest["b"][2]
+    )
+    assert hashed == [str(tmp_path / "b")]
+
+
+def test_manifest_differs():
+    manifest = {"a": [1, 10, "x"], "b": [1, 10, "y"]}
+    assert not complott.manifest_differs(manifest, dict(manifest))
+    assert not complott.manifest_differs(
+        manifest, {"a": [1, 20, "x"], "b": [1, 10, "y"]}
+    )
+    assert complott.manifest_differs(manifest, {"a": [1, 10, "z"], "b": [1, 10, "y"]})
+    assert complott.manifest_differs(manifest, {"a": [1, 10, "x"]})
+    assert complott.manifest_differs(manifest, {**manifest, "c": [1, 10, "z"]})
+    assert complott.manifest_differs(manifest, {})
+
+
+def test_unchanged_recipe_is_skipped(recipes_folder, build_folder, containers):
+    assert build(recipes_folder, build_folder).has_changed
+    assert not build(recipes_folder, build_folder).has_changed
+    assert len(containers.runs) == 1
+
+
+def test_touched_identical_file_is_skipped(
+    recipes_folder, build_folder, containers, monkeypatch
+):
+    build(recipes_folder, build_folder)
+    file_path = source_path(recipes_folder, "generate.py")
+    set_mtime(file_path, os.stat(file_path).st_mtime_ns + 1_000_000_000)
+    assert not build(recipes_folder, build_folder).has_changed
+    assert len(containers.runs) == 1
+
+    hashed = []
+    hash_file = complott.hash_file
+    monkeypatch.setattr(
+        complott,
+        "hash_file",
+        lambda file_path: hashed.append(file_path) or hash_file(file_path),
+    )
+    assert not build(recipes_folder, build_folder).has_changed
+    assert hashed == []
+
+
+@pytest.mark.parametrize(
+    "change",
+    [
+        lambda recipe_path: write_file(
+            os.path.join(recipe_path, "lib", "util.py"), "VALUE = 2\n"
+        ),
+        lambda recipe_path: write_file(os.path.join(recipe_path, "lib", "new.py"), ""),
+        lambda recipe_path: os.remove(os.path.join(recipe_path, "lib", "util.py")),
+    ],
+    ids=["edited", "added", "removed"],
+)
+def test_changed_recipe_is_rebuilt(recipes_folder, build_folder, containers, change):
+    build(recipes_folder, build_folder)
+    change(source_path(recipes_folder))
+    assert build(recipes_folder, build_folder).has_changed
+    assert len(containers.runs) == 2
+    assert not build(recipes_folder, build_folder).has_changed
+
+
+def test_changed_dependency_rebuilds(recipes_folder, build_folder, containers):
+    fetch = complott.Fetch({"type": "fetch", "url": "https://example.com/data.csv"})
+    dependency = complott.FetchDependency(fetch, {"type": "fetch", "url": fetch.url})
+    artifacts = {fetch.id(): fetch}
+    recipe = make_recipe([dependency])
+    recipe.build(recipes_folder, build_folder, artifacts)
+    fetch.has_changed = True
+    recipe = make_recipe([dependency])
+    recipe.build(recipes_folder, build_folder, artifacts)
+    assert recipe.has_changed
+    assert len(containers.runs) == 2
+    assert containers.runs[-1][fetch.get_build_path(build_folder)] == {
+        "bind": "/app/fetched/data.csv",
+        "mode": "ro",
+    }
+
+
+def test_failed_container_leaves_no_manifest(recipes_folder, build_folder, containers):
+    recipe = build(recipes_folder, build_folder)
+    manifest_path = complott.get_manifest_path(recipe.get_build_path(build_folder))
+    assert os.path.exists(manifest_path)
+
+    write_file(source_path(recipes_folder, "generate.py"), "raise Exception()\n")
+    containers.exit_status = 1
+    with pytest.raises(Exception, match="recipe failed"):
+        build(recipes_folder, build_folder)
+    assert not os.path.exists(manifest_path)
+
+    # the failed build is retried even though the sources did not change since
+    containers.exit_status = 0
+    assert build(recipes_folder, build_folder).has_changed
+    assert os.path.exists(manifest_path)
+
+
+def test_rebuild_keeps_data_unless_overriding(recipes_folder, build_folder, containers):
+    recipe = build(recipes_folder, build_folder)
+    build_path = recipe.get_build_path(build_folder)
+    data_file_path = os.path.join(build_path, "data", "output.csv")
+    stale_file_path = os.path.join(build_path, "generate.py")
+    for file_path in (data_file_path, stale_file_path):
+        write_file(file_path, "")
+
+    with open(source_path(recipes_folder, "generate.py"), "a") as file:
+        file.write("# changed\n")
+    build(recipes_folder, build_folder)
+    assert os.path.exists(data_file_path)
+    assert not os.path.exists(stale_file_path)
+
+    assert build(recipes_folder, build_folder, override=True).has_changed
+    assert os.listdir(build_path) == ["data"]
+    assert not os.path.exists(data_file_path)
@@ -0,0 +1,104 @@
+import csv
+
+import pytest
+
+from complott.recipe_helper import parse_csv_as_dict
+
+columns = ["key", "a", "b"]
+
+csv_cases = {
+    "well_formed": ("h;a;b\nx;1;2.5\ny;3;4.25\nz;5;6\n", 2, None),
+    "blank_line_in_range": ("h;a;b\nx;1;2\n\ny;3;4\nz;5;6\n", 2, 4),
+    "whitespace_only_line": ("x;1;2\n   \ny;3;4\n", 1, None),
+    "trailing_whitespace": ("x;1;2  \ny;3;4\t\n", 1, None),
+    "short_row": ("x;1;2\ny;3\nz;5;6\n", 1, None),
+    "extra_column": ("x;1;2\ny;3;4;7\nz;5;6\n", 1, None),
+    "empty_fields": ("x;;2\n;3;4\n", 1, None),
+    "large_int": ("x;123456789012345678901234567890;2\ny;-1;3\n", 1, None),
+    "quoted_delimiter": ('x;"1;0";2\ny;"3";4\n', 1, None),
+    "duplicate_keys": ("x;1;2\ny;3;4\nx;5;6\n", 1, None),
+}
+
+columns_types_cases = {
+    "default": None,
+    "str": [str, str, str],
+    "int_float": [str, int, float],
+}
+
+
+def reference_parse_csv_as_dict(
+    file_path,
+    columns,
+    index_column,
+    indices=None,
+    columns_types=None,
+    delimiter=";",
+    first_data_row=1,
+    last_data_row=None,
+):
+    # list based implementation that parse_csv_as_dict must stay equivalent to
+    with open(file_path, "r") as file:
+        lines = [line.rstrip() for line in file]
+    if last_data_row is None:
+        last_data_row = len(lines)
+    if columns_types is None:
+        columns_types = [str for _ in columns]
+    data_rows = [lines[i] for i in range(first_data_row - 1, last_data_row)]
+    rows = list(csv.DictReader(data_rows, fieldnames=columns, delimiter=delimiter))
+    keys = [row[index_column] for row in rows] if indices is None else indices
+    return {
+        i: {k: t(row[k]) for k, t in zip(columns, columns_types) if k != index_column}
+        for row, i in zip(rows, keys)
+    }
+
+
+def parse_or_error(parse, *args, **kwargs):
+    try:
+        return parse(*args, **kwargs)
+    except (TypeError, ValueError) as error:
+        return type(error)
+
+
+@pytest.mark.parametrize(
+    "columns_types", columns_types_cases.values(), ids=list(columns_types_cases)
+)
+@pytest.mark.parametrize("case", csv_cases.values(), ids=list(csv_cases))
+@pytest.mark.parametrize("indices", [None, ["i", "j"]], ids=["index_column", "indices"])
+def test_parse_csv_as_dict_matches_reference(tmp_path, case, columns_types, indices):
+    content, first_data_row, last_data_row = case
+    file_path = tmp_path / "data.csv"
+    file_path.write_text(content)
+    kwargs = dict(
+        indices=indices,
+        columns_types=columns_types,
+        first_data_row=first_data_row,
+        last_data_row=last_data_row,
+    )
+    expected = parse_or_error(
+        reference_parse_csv_as_dict, file_path, columns, "key", **kwargs
+    )
+    assert parse_or_error(parse_csv_as_dict, file_path, columns, "key", **kwargs) == (
+        expected
+    )
+
+
+def test_parse_csv_as_dict_row_handling(tmp_path):
+    file_path = tmp_path / "data.csv"
+    file_path.write_text(
+        "h;a;b\nx;1;2  \n\ny;3\nz;123456789012345678901234567890;6;7\n"
+    )
+    assert parse_csv_as_dict(file_path, columns, "key", first_data_row=2) == {
+        "x": {"a": "1", "b": "2"},
+        "y": {"a": "3", "b": "None"},
+        "z": {"a": "123456789012345678901234567890", "b": "6"},
+    }
+    assert parse_csv_as_dict(
+        file_path, columns, "key", first_data_row=2, last_data_row=4
+    ) == {"x": {"a": "1", "b": "2"}, "y": {"a": "3", "b": "None"}}
+    assert parse_csv_as_dict(
+        file_path,
+        columns,
+        "key",
+        columns_types=[str, int, str],
+        first_data_row=5,
+    ) == {"z": {"a": 123456789012345678901234567890, "b": "6"}}
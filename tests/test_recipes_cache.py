@@ -0,0 +1,140 @@
+import json
+import os
+
+import pytest
+
+from complott import complott
+
+
+def write_json(file_path, obj):
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    with open(file_path, "w") as file:
+        json.dump(obj, file)
+
+
+def touch(file_path, mtime_ns):
+    os.utime(file_path, ns=(mtime_ns, mtime_ns))
+
+
+def add_recipe(recipes_folder, recipe_name, dependencies=[]):
+    recipe_path = os.path.join(recipes_folder, recipe_name)
+    write_json(os.path.join(recipe_path, "versions.json"), {"v1": {"folder": "v1"}})
+    write_json(
+        os.path.join(recipe_path, "v1", "recipe.json"),
+        {"recipe_type": "python", "dependencies": dependencies},
+    )
+    return recipe_path
+
+
+@pytest.fixture
+def folders(tmp_path):
+    recipes_folder = str(tmp_path / "recipes")
+    build_folder = str(tmp_path / "build")
+    add_recipe(recipes_folder, "a")
+    add_recipe(
+        recipes_folder, "b", [{"type": "build", "recipe_name": "a", "version": "v1"}]
+    )
+    return recipes_folder, build_folder
+
+
+@pytest.fixture
+def load_calls(monkeypatch):
+    calls = []
+    load_recipes = complott.load_recipes
+
+    def counting_load_recipes(recipes_folder):
+        calls.append(recipes_folder)
+        return load_recipes(recipes_folder)
+
+    monkeypatch.setattr(complott, "load_recipes", counting_load_recipes)
+    return calls
+
+
+def load(folders):
+    # freshly loaded recipes hold tuples where cached ones hold lists
+    return sorted(json.loads(json.dumps(complott.load_recipes_cached(*folders))))
+
+
+def test_unchanged_recipes_are_read_from_cache(folders, load_calls):
+    recipes = load(folders)
+    assert len(load_calls) == 1
+    assert load(folders) == recipes
+    assert len(load_calls) == 1
+    assert set(complott.read_recipes(*folders)) == {"Recipe:a/v1", "Recipe:b/v1"}
+
+
+def test_unrelated_files_do_not_invalidate_cache(folders, load_calls):
+    recipes_folder, _ = folders
+    load(folders)
+    with open(os.path.join(recipes_folder, "a", "v1", "script.py"), "w") as file:
+        file.write("print('hello')\n")
+    load(folders)
+    assert len(load_calls) == 1
+
+
+def test_edited_recipe_json_invalidates_cache(folders, load_calls):
+    recipes_folder, _ = folders
+    recipe_json_path = os.path.join(recipes_folder, "b", "v1", "recipe.json")
+    load(folders)
+    mtime_ns = os.stat(recipe_json_path).st_mtime_ns
+    write_json(recipe_json_path, {"recipe_type": "python", "dependencies": []})
+    touch(recipe_json_path, mtime_ns)
+    recipes = load(folders)
+    assert len(load_calls) == 2
+    assert recipes[1][2][0][2]["dependencies"] == []
+
+
+def test_touched_versions_json_invalidates_cache(folders, load_calls):
+    recipes_folder, _ = folders
+    versions_path = os.path.join(recipes_folder, "a", "versions.json")
+    load(folders)
+    touch(versions_path, os.stat(versions_path).st_mtime_ns + 1_000_000_000)
+    load(folders)
+    assert len(load_calls) == 2
+
+
+def test_added_or_removed_recipe_invalidates_cache(folders, load_calls):
+    recipes_folder, _ = folders
+    load(folders)
+    add_recipe(recipes_folder, "c")
+    assert [recipe_name for recipe_name, _, _ in load(folders)] == ["a", "b", "c"]
+    os.rename(
+        os.path.join(recipes_folder, "c"),
+        os.path.join(os.path.dirname(recipes_folder), "c"),
+    )
+    assert [recipe_name for recipe_name, _, _ in load(folders)] == ["a", "b"]
+    assert len(load_calls) == 3
+
+
+def test_created_recipe_json_invalidates_cache(folders, load_calls):
+    recipes_folder, _ = folders
+    recipe_path = os.path.join(recipes_folder, "a")
+    write_json(
+        os.path.join(recipe_path, "versions.json"),
+        {"v1": {"folder": "v1"}, "v2": {"folder": "v2"}},
+    )
+    recipes = load(folders)
+    assert [version[0] for version in recipes[0][2]] == ["v1"]
+    write_json(
+        os.path.join(recipe_path, "v2", "recipe.json"),
+        {"recipe_type": "python", "dependencies": []},
+    )
+    recipes = load(folders)
+    assert [version[0] for version in recipes[0][2]] == ["v1", "v2"]
+    assert len(load_calls) == 2
+
+
+def test_schemas_change_invalidates_cache(folders, load_calls, monkeypatch):
+    load(folders)
+    monkeypatch.setattr(complott, "recipes_schemas_hash", "0" * 40)
+    load(folders)
+    assert len(load_calls) == 2
+
+
+def test_corrupted_cache_is_rebuilt(folders, load_calls):
+    _, build_folder = folders
+    recipes = load(folders)
+    with open(os.path.join(build_folder, ".recipe_cache.json"), "w") as file:
+        file.write('{"schemas_hash": ')
+    assert load(folders) == recipes
+    assert len(load_calls) == 2